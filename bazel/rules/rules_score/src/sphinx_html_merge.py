@@ -11,17 +11,194 @@ Usage:
 """
 
 import argparse
+import concurrent.futures
+import errno
 import os
 import re
-import shutil
 import sys
 from pathlib import Path
 
+try:
+    import fcntl
+except ImportError:  # not available on Windows
+    fcntl = None
+
 
 # Standard Sphinx directories that should be copied
 # Note: _static and _sphinx_design_static are excluded for dependencies to avoid duplication
 SPHINX_DIRS = {"_sources", ".doctrees"}
 
+# Buffer size for the userspace copy fallback
+COPY_BUFSIZE = 1 << 20
+
+# Above this many sibling modules, links are matched by path segment and looked
+# up in a set instead of compiling all names into one regex alternation
+MAX_MODULE_ALTERNATION = 32
+
+# ioctl request number for cloning a whole file (Linux FICLONE)
+FICLONE = 0x40049409
+
+# Errors signalling that a kernel copy primitive is unusable for this file pair.
+# FICLONE and sendfile to a regular file are Linux only, other POSIX systems
+# reject them with ENOTTY and ENOTSOCK.
+_FASTCOPY_FALLBACK_ERRNOS = {
+    errno.EXDEV,
+    errno.ENOSYS,
+    errno.EINVAL,
+    errno.EOPNOTSUPP,
+    errno.ENOTSUP,
+    errno.EBADF,
+    errno.ENOTTY,
+    errno.ENOTSOCK,
+}
+
+
+def _available_cpus():
+    """Number of CPUs this process may run on, honouring its affinity mask."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def _open_new(path):
+    """Open path for writing as a new file, replacing any existing one.
+
+    Existing destination files may be hard links to input files, so they are
+    unlinked rather than truncated and written through.
+    """
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL
+    try:
+        return os.open(path, flags, 0o666)
+    except FileExistsError:
+        os.unlink(path)
+        return os.open(path, flags, 0o666)
+
+
+def _fast_clone(src, dst, st=None):
+    """Make dst a copy of src that is never going to be modified.
+
+    Sphinx output is immutable once emitted, so a hard link is enough when
+    src and dst are on the same filesystem. Otherwise fall back to
+    _fastcopy.
+
+    Args:
+        src: Source file path
+        dst: Destination file path
+        st: Optional os.stat_result of src (e.g. from a cached DirEntry)
+    """
+    for _ in range(2):
+        try:
+            os.link(src, dst)
+            return
+        except FileExistsError:
+            os.unlink(dst)
+        except OSError:
+            break
+    _fastcopy(src, dst, st)
+
+
+def _fastcopy(src, dst, st=None):
+    """Copy file contents and metadata from src to dst.
+
+    Tries a FICLONE reflink first, then os.copy_file_range (allows reflinks /
+    server-side copies), os.sendfile and finally a buffered readinto loop.
+    Permission bits and timestamps are copied afterwards to match
+    shutil.copy2 semantics.
+
+    Args:
+        src: Source file path
+        dst: Destination file path
+        st: Optional os.stat_result of src (e.g. from a cached DirEntry)
+    """
+    src_fd = os.open(src, os.O_RDONLY)
+    try:
+        if st is None:
+            st = os.fstat(src_fd)
+        dst_fd = _open_new(dst)
+        try:
+            _copy_fd(src_fd, dst_fd)
+        finally:
+            os.close(dst_fd)
+    finally:
+        os.close(src_fd)
+
+    os.utime(dst, ns=(st.st_atime_ns, st.st_mtime_ns))
+    os.chmod(dst, st.st_mode & 0o7777)
+
+
+def _copy_fd(src_fd, dst_fd):
+    """Copy all remaining data from src_fd to dst_fd."""
+    if fcntl is not None:
+        try:
+            fcntl.ioctl(dst_fd, FICLONE, src_fd)
+            return
+        except OSError as e:
+            if e.errno not in _FASTCOPY_FALLBACK_ERRNOS:
+                raise
+
+    if hasattr(os, "copy_file_range"):
+        try:
+            while os.copy_file_range(src_fd, dst_fd, 1 << 30):
+                pass
+            return
+        except OSError as e:
+            if e.errno not in _FASTCOPY_FALLBACK_ERRNOS:
+                raise
+            # Nothing may have been written yet, but make sure we restart cleanly
+            os.lseek(src_fd, 0, os.SEEK_SET)
+            os.ftruncate(dst_fd, 0)
+            os.lseek(dst_fd, 0, os.SEEK_SET)
+
+    if hasattr(os, "sendfile"):
+        try:
+            offset = 0
+            while sent := os.sendfile(dst_fd, src_fd, offset, COPY_BUFSIZE):
+                offset += sent
+            return
+        except OSError as e:
+            if e.errno not in _FASTCOPY_FALLBACK_ERRNOS:
+                raise
+            os.lseek(src_fd, 0, os.SEEK_SET)
+            os.ftruncate(dst_fd, 0)
+            os.lseek(dst_fd, 0, os.SEEK_SET)
+
+    buf = bytearray(COPY_BUFSIZE)
+    view = memoryview(buf)
+    with open(src_fd, "rb", buffering=0, closefd=False) as fsrc:
+        while n := fsrc.readinto(buf):
+            os.write(dst_fd, view[:n])
+
+
+def _build_link_pattern(modules):
+    """Compile the link fixing pattern for a set of sibling modules.
+
+    A single pattern matches both sibling module references (group ``mod``)
+    and static asset references (group ``static``), so HTML files are only
+    scanned once. For many modules a long alternation makes every scan
+    slower, so the pattern then matches any leading path segment and the
+    caller checks it against the returned names instead.
+
+    Args:
+        modules: Frozenset of sibling module names
+
+    Returns:
+        Tuple of (compiled bytes pattern, frozenset of lower-cased module names)
+    """
+    names = frozenset(mod.encode("utf-8").lower() for mod in modules)
+    if len(modules) > MAX_MODULE_ALTERNATION:
+        mod_pattern = rb'[^/"]+'
+    else:
+        mod_pattern = b"|".join(
+            re.escape(mod.encode("utf-8")) for mod in sorted(modules)
+        )
+    pattern = re.compile(
+        rb'(?P<attr>(?:href|src)=")(?:'
+        rb"(?:\.\./)*(?P<static>_static|_sphinx_design_static)/"
+        rb"|(?P<mod>" + mod_pattern + rb")/)",
+        re.IGNORECASE,
+    )
+    return pattern, names
+
 
 def copy_html_files(src_dir, dst_dir, exclude_module_dirs=None, sibling_modules=None):
     """Copy HTML and related files from src to dst, with optional link fixing.
@@ -46,80 +223,91 @@ def copy_html_files(src_dir, dst_dir, exclude_module_dirs=None, sibling_modules=
     if exclude_module_dirs is None:
         exclude_module_dirs = set()
 
-    # Prepare regex patterns for link fixing if needed
-    module_pattern = None
-    static_pattern = None
+    # Prepare regex pattern for link fixing if needed
+    link_pattern = None
     if sibling_modules:
-        module_pattern = re.compile(
-            r'((?:href|src)=")('
-            + "|".join(re.escape(mod) for mod in sibling_modules)
-            + r")/",
-            re.IGNORECASE,
-        )
-        static_pattern = re.compile(
-            r'((?:href|src)=")(\.\./)*(_static|_sphinx_design_static)/', re.IGNORECASE
-        )
+        link_pattern, sibling_names = _build_link_pattern(frozenset(sibling_modules))
 
-    def process_file(src_file, dst_file, relative_path):
-        """Read, optionally modify, and write a file."""
-        if src_file.suffix == ".html" and sibling_modules:
+    def process_file(entry, dst_file, depth):
+        """Read, optionally modify, and write a file.
+
+        depth is the number of directories between src_dir and the file.
+        """
+        if sibling_modules and entry.name.endswith(".html"):
             # Read, modify, and write HTML files
             try:
-                content = src_file.read_text(encoding="utf-8")
+                with open(entry.path, "rb") as fh:
+                    content = fh.read()
 
-                # Replace module_name/ with ../module_name/
-                modified_content = module_pattern.sub(r"\1../\2/", content)
+                # Calculate prefix for static file references
+                parent_prefix = b"../" * (depth + 1)
 
-                # Calculate depth for static file references
-                depth = len(relative_path.parents) - 1
-                parent_prefix = "../" * (depth + 1)
+                def replace_link(match):
+                    mod = match.group("mod")
+                    if mod is None:
+                        static = match.group("static")
+                        return match.group("attr") + parent_prefix + static + b"/"
+                    if mod.lower() not in sibling_names:
+                        return match.group(0)
+                    # Replace module_name/ with ../module_name/
+                    return match.group("attr") + b"../" + mod + b"/"
 
-                def replace_static(match):
-                    return f"{match.group(1)}{parent_prefix}{match.group(3)}/"
+                modified_content = link_pattern.sub(replace_link, content)
 
-                modified_content = static_pattern.sub(replace_static, modified_content)
+                if modified_content == content:
+                    # Nothing to fix, avoid rewriting the file
+                    _fast_clone(entry.path, dst_file, entry.stat())
+                    return
 
                 # Write modified content
-                dst_file.parent.mkdir(parents=True, exist_ok=True)
-                dst_file.write_text(modified_content, encoding="utf-8")
+                with open(_open_new(dst_file), "wb") as fh:
+                    fh.write(modified_content)
             except Exception as e:
-                print(f"Warning: Failed to process {src_file}: {e}", file=sys.stderr)
+                print(f"Warning: Failed to process {entry.path}: {e}", file=sys.stderr)
                 # Fallback to regular copy on error
-                shutil.copy2(src_file, dst_file)
+                _fastcopy(entry.path, dst_file)
         else:
             # Regular copy for non-HTML files
-            dst_file.parent.mkdir(parents=True, exist_ok=True)
-            shutil.copy2(src_file, dst_file)
-
-    def copy_tree(src, dst, rel_path):
-        """Recursively copy directory tree with processing."""
-        for item in src.iterdir():
-            rel_item = rel_path / item.name
-            dst_item = dst / item.name
-
-            if item.is_file():
-                process_file(item, dst_item, rel_item)
-            elif item.is_dir():
-                # Skip excluded directories
-                if item.name in exclude_module_dirs:
-                    continue
-                # Skip static dirs from dependencies
-                if (
-                    item.name in ("_static", "_sphinx_design_static")
-                    and exclude_module_dirs
-                ):
-                    continue
-
-                dst_item.mkdir(parents=True, exist_ok=True)
-                copy_tree(item, dst_item, rel_item)
+            _fast_clone(entry.path, dst_file, entry.stat())
+
+    def copy_tree(src, dst, depth):
+        """Iteratively copy directory tree with processing."""
+        stack = [(src, dst, depth)]
+        while stack:
+            src_dir, dst_dir, dir_depth = stack.pop()
+            with os.scandir(src_dir) as entries:
+                for entry in entries:
+                    dst_item = dst_dir / entry.name
+
+                    if entry.is_file():
+                        process_file(entry, dst_item, dir_depth)
+                    elif entry.is_dir():
+                        # Skip excluded directories
+                        if entry.name in exclude_module_dirs:
+                            continue
+                        # Skip static dirs from dependencies
+                        if (
+                            entry.name in ("_static", "_sphinx_design_static")
+                            and exclude_module_dirs
+                        ):
+                            continue
+
+                        # Created before descending so files never need to
+                        # check for their parent directory
+                        dst_item.mkdir(exist_ok=True)
+                        stack.append((entry.path, dst_item, dir_depth + 1))
 
     # Start copying from root
-    copy_tree(src_path, dst_path, Path("."))
+    copy_tree(src_path, dst_path, 0)
 
 
 def merge_html_dirs(output_dir, main_html_dir, dependencies):
     """Merge HTML directories.
 
+    Dependency modules are independent of each other, so they are copied in
+    parallel worker processes once the main HTML directory is in place. With a
+    single dependency or a single usable CPU they are copied in-process.
+
     Args:
         output_dir: Target output directory
         main_html_dir: Main module's HTML directory to copy as-is
@@ -131,22 +319,49 @@ def merge_html_dirs(output_dir, main_html_dir, dependencies):
     print(f"Copying main HTML from {main_html_dir} to {output_dir}")
     copy_html_files(main_html_dir, output_dir)
 
+    if not dependencies:
+        return
+
     # Collect all dependency names for link fixing and exclusion
     dep_names = [name for name, _ in dependencies]
 
     # Then copy each dependency into a subdirectory with link fixing
+    jobs = []
     for dep_name, dep_html_dir in dependencies:
         dep_output = output_path / dep_name
         print(f"Copying dependency {dep_name} from {dep_html_dir} to {dep_output}")
         # Exclude other module directories to avoid nested modules
         # Remove current module from the list to get actual siblings to exclude
         sibling_modules = set(n for n in dep_names if n != dep_name)
-        copy_html_files(
-            dep_html_dir,
-            dep_output,
-            exclude_module_dirs=sibling_modules,
-            sibling_modules=sibling_modules,
-        )
+        jobs.append((dep_html_dir, dep_output, sibling_modules))
+
+    max_workers = min(len(jobs), _available_cpus())
+    if max_workers == 1:
+        # A pool would only add process startup and IPC cost
+        for dep_html_dir, dep_output, sibling_modules in jobs:
+            copy_html_files(
+                dep_html_dir,
+                dep_output,
+                exclude_module_dirs=sibling_modules,
+                sibling_modules=sibling_modules,
+            )
+        return
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(
+                copy_html_files,
+                dep_html_dir,
+                dep_output,
+                exclude_module_dirs=sibling_modules,
+                sibling_modules=sibling_modules,
+            )
+            for dep_html_dir, dep_output, sibling_modules in jobs
+        ]
+
+        # Propagate the first failure, if any
+        for future in concurrent.futures.as_completed(futures):
+            future.result()
 
 
 def main():
@@ -34,24 +34,54 @@ logger = logging.getLogger(__name__)
 SANDBOX_PATH = re.compile(r"^.*_main/")
 
 
-class StdoutProcessor:
+class _LineProcessor:
+    """Buffer written text and emit one prefixed, sandbox-stripped line per line."""
+
+    prefix = ""
+    # Name of the original interpreter stream in `sys` that lines are written to
+    stream_name = ""
+    _strip = staticmethod(SANDBOX_PATH.sub)
+
+    def __init__(self):
+        self._buf = []
+        self._stream = getattr(sys, self.stream_name)
+
+    def _emit(self, lines):
+        out = []
+        for line in lines:
+            stripped = line.strip()
+            if stripped:
+                text = self._strip("", stripped)
+                out.append(f"{self.prefix}: {text.strip()}\n")
+        if out:
+            self._stream.writelines(out)
+
     def write(self, text):
-        if text.strip():
-            text = re.sub(SANDBOX_PATH, "", text)
-            sys.__stdout__.write(f"[SPHINX_STDOUT]: {text.strip()}\n")
+        self._buf.append(text)
+        if "\n" not in text:
+            return
+        lines = "".join(self._buf).split("\n")
+        # Keep the trailing partial line until more text (or a flush) arrives
+        remainder = lines.pop()
+        self._buf = [remainder] if remainder else []
+        self._emit(lines)
 
     def flush(self):
-        sys.__stdout__.flush()
+        if self._buf:
+            remainder = "".join(self._buf)
+            self._buf = []
+            self._emit([remainder])
+        self._stream.flush()
 
 
-class StderrProcessor:
-    def write(self, text):
-        if text.strip():
-            text = re.sub(SANDBOX_PATH, "", text)
-            sys.__stderr__.write(f"[SPHINX_STDERR]: {text.strip()}\n")
+class StdoutProcessor(_LineProcessor):
+    prefix = "[SPHINX_STDOUT]"
+    stream_name = "__stdout__"
 
-    def flush(self):
-        sys.__stderr__.flush()
+
+class StderrProcessor(_LineProcessor):
+    prefix = "[SPHINX_STDERR]"
+    stream_name = "__stderr__"
 
 
 def get_env(name: str, required: bool = True) -> Optional[str]:
@@ -245,10 +275,15 @@ def main() -> int:
         stdout_processor = StdoutProcessor()
         stderr_processor = StderrProcessor()
         # Redirect stdout and stderr
-        with redirect_stderr(stdout_processor), redirect_stdout(stderr_processor):
-            sphinx_args = build_sphinx_arguments(args)
-            exit_code = run_sphinx_build(sphinx_args, args.builder)
-            exit_code = 0
+        try:
+            with redirect_stderr(stdout_processor), redirect_stdout(stderr_processor):
+                sphinx_args = build_sphinx_arguments(args)
+                exit_code = run_sphinx_build(sphinx_args, args.builder)
+                exit_code = 0
+        finally:
+            # Drain any partial line still held by the processors
+            stdout_processor.flush()
+            stderr_processor.flush()
         return exit_code
     except ValueError as e:
         logger.error(f"Validation error: {e}")
@@ -18,6 +18,7 @@ This file is auto-generated from a template and should not be edited directly.
 Template variables like {PROJECT_NAME} are replaced during Bazel build.
 """
 
+import functools
 import json
 import os
 from pathlib import Path
@@ -77,6 +78,7 @@ NEEDS_EXTERNAL_FILE = "needs_external_needs.json"
 BAZEL_OUT_DIR = "bazel-out"
 
 
+@functools.lru_cache(maxsize=1)
 def find_workspace_root() -> Path:
     """
     Find the Bazel workspace root by looking for the bazel-out directory.
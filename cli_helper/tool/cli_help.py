@@ -10,16 +10,12 @@
 #
 # SPDX-License-Identifier: Apache-2.0
 # *******************************************************************************
-import os, subprocess, shutil, textwrap, xml.etree.ElementTree as ET
+import json, os, subprocess, shutil, textwrap
 
 
-def bazel(*args: str) -> str:
-    try:
-        output = subprocess.check_output(["bazel", *args], text=True)
-    except subprocess.CalledProcessError as e:
-        print(f"\033[31m !! Error in bazel query, help string is incomplete!!:\033[0m")
-        output = e.output
-    return output
+def bazel(*args: str) -> subprocess.Popen:
+    # stream stdout so that parsing overlaps with the query
+    return subprocess.Popen(["bazel", *args], stdout=subprocess.PIPE, bufsize=1 << 20)
 
 
 # When invoked via `bazel run`, Bazel sets this env var
@@ -30,32 +26,39 @@ if ws:
 # build a single query for all cli_help tags
 expr = 'kind("rule", attr(tags, "cli_help=.*", deps(//...)))'
 
-xml = bazel(
+# format the output
+rows, max_len = [], 0
+with bazel(
     "query",
     expr,
-    "--output=xml",
+    # one compact JSON record per target, parsed as it arrives
+    "--output=streamed_jsonproto",
     "--keep_going",
     "--ui_event_filters=-INFO,-progress",
     "--noshow_progress",
-)
-
-root = ET.fromstring(xml)
+) as proc:
+    for line in proc.stdout:
+        target = json.loads(line)
+        if target.get("type") != "RULE":
+            continue
+        rule = target["rule"]
+        label = rule["name"]
+        # define here if you want to skip some targets
+        if label.endswith(".find_main"):
+            continue
 
-# format the output
-rows, max_len = [], 0
-for rule in root.iter("rule"):
-    label = rule.get("name")
-    # define here if you want to skip some targets
-    if label.endswith(".find_main"):
-        continue
+        tags = next(
+            (a for a in rule.get("attribute", ()) if a.get("name") == "tags"), {}
+        )
+        for t in tags.get("stringListValue", ()):
+            if t.startswith("cli_help="):
+                desc = t.partition("=")[2]
+                rows.append((label, desc))
+                max_len = max(max_len, len(label))
+                break
 
-    tags = [n.get("value") for n in rule.findall("list[@name='tags']/*")]
-    for t in tags:
-        if t.startswith("cli_help="):
-            desc = t.split("=", 1)[1]
-            rows.append((label, desc))
-            max_len = max(max_len, len(label))
-            break
+if proc.returncode != 0:
+    print(f"\033[31m !! Error in bazel query, help string is incomplete!!:\033[0m")
 
 # pretty-print
 col_w = (max_len + 2) if rows else 2
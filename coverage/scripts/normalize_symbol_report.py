@@ -1,8 +1,30 @@
 #!/usr/bin/env python3
 import json
+import os
 import sys
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # the script runs on the host python3, orjson is optional
+    orjson = None
+
+
+def load_json(path: Path):
+    if orjson is not None:
+        return orjson.loads(path.read_bytes())
+    with path.open("r", encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def dump_json(path: Path, data) -> None:
+    if orjson is not None:
+        path.write_bytes(orjson.dumps(data))
+        return
+    with path.open("w", encoding="utf-8") as fh:
+        json.dump(data, fh)
+
+
 if len(sys.argv) < 2:
     print(
         "usage: normalize_symbol_report.py <symbol_report_json> [roots...]",
@@ -15,49 +37,56 @@ roots = []
 for arg in sys.argv[2:]:
     if arg:
         roots.append(Path(arg).resolve())
+# plain strings so that matching does not need a Path per symbol
+root_strs = [str(root).rstrip(os.sep) or os.sep for root in roots]
+root_prefixes = [root.rstrip(os.sep) + os.sep for root in root_strs]
 
-with json_path.open("r", encoding="utf-8") as fh:
-    data = json.load(fh)
+data = load_json(json_path)
 
 
-def relativize(p: Path):
-    if not p.is_absolute():
-        return p.as_posix()
-    for root in roots:
-        try:
-            return p.relative_to(root).as_posix()
-        except ValueError:
-            pass
+def _strip_root(fname: str):
+    for root, prefix in zip(root_strs, root_prefixes):
+        if fname == root:
+            return "."
+        if fname.startswith(prefix):
+            return fname[len(prefix) :].replace(os.sep, "/")
+    return None
+
+
+def relativize(fname: str):
+    if not os.path.isabs(fname):
+        return Path(fname).as_posix()
+    # normpath is a pure string operation, it collapses "//" and "." segments
+    rel = _strip_root(os.path.normpath(fname))
+    if rel is not None:
+        return rel
+    # only resolve symlinks when the path is not directly below a root
     try:
-        rp = p.resolve()
+        rp = os.path.realpath(fname)
     except Exception:
         return None
-    for root in roots:
-        try:
-            return rp.relative_to(root).as_posix()
-        except ValueError:
-            pass
-    return None
+    return _strip_root(rp)
 
 
-changed = False
+original = data.get("symbols", [])
+rewritten = False
 symbols = []
-for sym in data.get("symbols", []):
+for sym in original:
     fname = sym.get("filename")
     if not fname:
         continue
-    rel = relativize(Path(fname))
+    rel = relativize(fname)
     if rel is None:
-        changed = True
         continue
     if rel != fname:
         sym["filename"] = rel
-        changed = True
+        rewritten = True
     symbols.append(sym)
 
-if symbols != data.get("symbols", []):
-    data["symbols"] = symbols
+# symbols are only ever removed, so equal lengths mean nothing was dropped
+dropped = len(symbols) != len(original)
 
-if changed:
-    with json_path.open("w", encoding="utf-8") as fh:
-        json.dump(data, fh)
+# leave the report untouched when it is already normalized
+if rewritten or dropped:
+    data["symbols"] = symbols
+    dump_json(json_path, data)
@@ -1,20 +1,34 @@
 #!/usr/bin/env python3
+import mmap
+import os
 import re
 import sys
 from pathlib import Path
 
+# Only start a match at the beginning of a digit run, otherwise long runs of
+# digits (e.g. inlined base64 data) are rescanned from every position.
+LINE_COVERAGE = re.compile(
+    rb"(?<![0-9])([0-9]+(?:\.[0-9]+)?)%\s*\(([0-9]+)/([0-9]+)\s+lines\)"
+)
+
 if len(sys.argv) != 2:
     print("usage: parse_line_coverage.py <html_path>", file=sys.stderr)
     sys.exit(2)
 
 path = Path(sys.argv[1])
+groups = None
 try:
-    text = path.read_text(encoding="utf-8", errors="ignore")
+    with path.open("rb") as fh:
+        # mmap cannot map an empty file
+        if os.fstat(fh.fileno()).st_size:
+            with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                m = LINE_COVERAGE.search(mm)
+                if m:
+                    groups = [g.decode("ascii") for g in m.groups()]
 except FileNotFoundError:
     sys.exit(1)
 
-m = re.search(r"([0-9]+(?:\.[0-9]+)?)%\s*\((\d+)/(\d+)\s+lines\)", text)
-if not m:
+if not groups:
     sys.exit(2)
 
-print(f"{m.group(1)} {m.group(2)} {m.group(3)}")
+print(" ".join(groups))
@@ -25,3 +25,32 @@ if files != expected:
 
 print("ok")
 PY
+
+# filenames below a root that are not in normal form, and the root itself
+root="$(cd "${workdir}" && pwd -P)/root"
+mkdir -p "${root}"
+cat >"${workdir}/unnormalized_report.json" <<JSON
+{
+  "symbols": [
+    {"filename": "${root}//src/./e.c"},
+    {"filename": "${root}"}
+  ]
+}
+JSON
+
+python3 "${script}" "${workdir}/unnormalized_report.json" "${root}"
+
+python3 - "${workdir}/unnormalized_report.json" <<'PY'
+import json
+import sys
+
+with open(sys.argv[1], "r", encoding="utf-8") as fh:
+    data = json.load(fh)
+
+files = [s.get("filename") for s in data.get("symbols", [])]
+expected = ["src/e.c", "."]
+if files != expected:
+    raise SystemExit(f"unexpected filenames: {files}")
+
+print("ok")
+PY
@@ -0,0 +1,51 @@
+# *******************************************************************************
+# Copyright (c) 2025 Contributors to the Eclipse Foundation
+#
+# See the NOTICE file(s) distributed with this work for additional
+# information regarding copyright ownership.
+#
+# This program and the accompanying materials are made available under the
+# terms of the Apache License Version 2.0 which is available at
+# https://www.apache.org/licenses/LICENSE-2.0
+#
+# SPDX-License-Identifier: Apache-2.0
+# *******************************************************************************
+# shared fixtures for the cr_checker unit tests
+from __future__ import annotations
+
+import functools
+import importlib
+import sys
+from pathlib import Path
+
+import pytest
+
+CR_CHECKER_DIR = Path(__file__).resolve().parents[1]
+
+# make the tool importable as a regular module
+TOOL_DIR = str(CR_CHECKER_DIR / "tool")
+if TOOL_DIR not in sys.path:
+    sys.path.insert(0, TOOL_DIR)
+
+
+# import the cr_checker module
+@pytest.fixture(scope="session")
+def cr_checker():
+    return importlib.import_module("cr_checker")
+
+
+# load and parse all license templates, only once per test session
+@pytest.fixture(scope="session")
+def templates(cr_checker) -> dict:
+    template_file = CR_CHECKER_DIR / "resources" / "templates.ini"
+    return cr_checker.load_templates(template_file)
+
+
+# format a license header, each (extension, year, author) combination only once
+@pytest.fixture(scope="session")
+def formatted_header(templates):
+    @functools.lru_cache(maxsize=None)
+    def format_header(extension: str, year: int, author: str) -> str:
+        return templates[extension].format(year=year, author=author)
+
+    return format_header
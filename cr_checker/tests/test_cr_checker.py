@@ -13,31 +13,13 @@
 # unit tests for the shebang handling in the cr_checker module
 from __future__ import annotations
 
-import importlib.util
 import json
 import pytest
 from datetime import datetime
 from pathlib import Path
 
-
-# load the cr_checker module
-def load_cr_checker_module():
-    module_path = Path(__file__).resolve().parents[1] / "tool" / "cr_checker.py"
-    spec = importlib.util.spec_from_file_location("cr_checker_module", module_path)
-    if spec is None or spec.loader is None:
-        raise RuntimeError(f"Failed to load cr_checker module from {module_path}")
-
-    module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(module)
-    return module
-
-
-# load the license template
-def load_template(extension: str) -> str:
-    cr_checker = load_cr_checker_module()
-    template_file = Path(__file__).resolve().parents[1] / "resources" / "templates.ini"
-    templates = cr_checker.load_templates(template_file)
-    return templates[extension]
+# evaluated once so that all tests of a run agree on the year
+CURRENT_YEAR = datetime.now().year
 
 
 # write the config file here so that the year is always up to date with the year
@@ -48,86 +30,52 @@ def write_config(path: Path, author: str) -> Path:
     return config_path
 
 
-# test that offset matches the length of the shebang line including trailing newlines
-def test_detect_shebang_offset_counts_trailing_newlines(tmp_path):
-    cr_checker = load_cr_checker_module()
-    script = tmp_path / "script.py"
-    script.write_text(
-        "#!/usr/bin/env python3\n\nprint('hi')\n",
-        encoding="utf-8",
-    )
-
-    offset = cr_checker.detect_shebang_offset(script, "utf-8")
-
-    assert offset == len("#!/usr/bin/env python3\n\n".encode("utf-8"))
-
-
-@pytest.fixture(
-    params=[
-        "cpp",
-        "c",
-        "h",
-        "hpp",
-        "py",
-        "sh",
-        "bzl",
-        "ini",
-        "yml",
-        "BUILD",
-        "bazel",
-        "rs",
-        "rst",
-    ]
+# test that the header pattern skips the shebang line including trailing newlines
+def test_compile_template_skips_shebang_and_trailing_newlines(cr_checker):
+    pattern = cr_checker.compile_template("# Copyright {year} {author}\n", shebang=True)
+
+    assert pattern.match("#!/usr/bin/env python3\n\n# Copyright 2024 Author\n")
+    assert pattern.match("# Copyright 2024 Author\n")
+    assert not pattern.match("#!/usr/bin/env python3\nprint('hi')\n")
+
+
+# file extensions covered by templates.ini
+EXTENSIONS = (
+    "cpp",
+    "c",
+    "h",
+    "hpp",
+    "py",
+    "sh",
+    "bzl",
+    "ini",
+    "yml",
+    "BUILD",
+    "bazel",
+    "rs",
+    "rst",
 )
-def prepare_test_with_header(request: SubRequest, tmp_path: PosixPath) -> tuple:
-    extension = request.param
-    test_file = tmp_path / ("file." + extension)
-    header_template = load_template(extension)
-    current_year = datetime.now().year
-    header = header_template.format(year=current_year, author="Author")
-    test_file.write_text(
-        header + "some content\n",
-        encoding="utf-8",
-    )
-    return test_file, extension, header_template
-
-
-@pytest.fixture(
-    params=[
-        "cpp",
-        "c",
-        "h",
-        "hpp",
-        "py",
-        "sh",
-        "bzl",
-        "ini",
-        "yml",
-        "BUILD",
-        "bazel",
-        "rs",
-        "rst",
-    ]
-)
-def prepare_test_no_header(request: SubRequest, tmp_path: PosixPath) -> tuple:
-    extension = request.param
+
+
+# write a test file with the given content for an extension
+def write_test_file(tmp_path: Path, extension: str, content: bytes) -> Path:
     test_file = tmp_path / ("file." + extension)
-    header_template = load_template(extension)
-    current_year = datetime.now().year
-    test_file.write_text(
-        "some content\n",
-        encoding="utf-8",
-    )
-    return test_file, extension, header_template, tmp_path
+    test_file.write_bytes(content)
+    return test_file
 
 
-def test_process_files_detects_header(prepare_test_with_header):
-    cr_checker = load_cr_checker_module()
-    test_file, extension, header_template = prepare_test_with_header
+@pytest.mark.parametrize("extension", EXTENSIONS)
+def test_process_files_detects_header(
+    cr_checker, templates, formatted_header, tmp_path, extension
+):
+    header = formatted_header(extension, CURRENT_YEAR, "Author")
+    test_file = write_test_file(
+        tmp_path, extension, header.encode("utf-8") + b"some content\n"
+    )
 
     results = cr_checker.process_files(
         [test_file],
-        {extension: header_template},
+        {extension: templates[extension]},
         False,
         use_mmap=False,
         encoding="utf-8",
@@ -138,13 +86,15 @@ def test_process_files_detects_header(prepare_test_with_header):
     assert results["no_copyright"] == 0
 
 
-def test_process_files_detects_missing_header(prepare_test_no_header):
-    cr_checker = load_cr_checker_module()
-    test_file, extension, header_template, tmp_path = prepare_test_no_header
+@pytest.mark.parametrize("extension", EXTENSIONS)
+def test_process_files_detects_missing_header(
+    cr_checker, templates, tmp_path, extension
+):
+    test_file = write_test_file(tmp_path, extension, b"some content\n")
 
     results = cr_checker.process_files(
         [test_file],
-        {extension: header_template},
+        {extension: templates[extension]},
         False,
         use_mmap=False,
         encoding="utf-8",
@@ -155,15 +105,17 @@ def test_process_files_detects_missing_header(prepare_test_no_header):
     assert results["no_copyright"] == 1
 
 
-def test_process_files_inserts_missing_header(prepare_test_no_header):
-    cr_checker = load_cr_checker_module()
-    test_file, extension, header_template, tmp_path = prepare_test_no_header
+@pytest.mark.parametrize("extension", EXTENSIONS)
+def test_process_files_inserts_missing_header(
+    cr_checker, templates, formatted_header, tmp_path, extension
+):
+    test_file = write_test_file(tmp_path, extension, b"some content\n")
     author = "Author"
     config = write_config(tmp_path, author)
 
     results = cr_checker.process_files(
         [test_file],
-        {extension: header_template},
+        {extension: templates[extension]},
         True,
         config=config,
         use_mmap=False,
@@ -174,17 +126,19 @@ def test_process_files_inserts_missing_header(prepare_test_no_header):
 
     assert results["no_copyright"] == 1
     assert results["fixed"] == 1
-    expected_header = header_template.format(year=datetime.now().year, author="Author")
-    assert test_file.read_text(encoding="utf-8").startswith(expected_header)
+    expected_header = formatted_header(extension, CURRENT_YEAR, "Author")
+    assert test_file.read_bytes().startswith(expected_header.encode("utf-8"))
 
 
-def test_process_files_skips_exclusion_with_missing_header(prepare_test_no_header):
-    cr_checker = load_cr_checker_module()
-    test_file, extension, header_template, tmp_path = prepare_test_no_header
+@pytest.mark.parametrize("extension", EXTENSIONS)
+def test_process_files_skips_exclusion_with_missing_header(
+    cr_checker, templates, tmp_path, extension
+):
+    test_file = write_test_file(tmp_path, extension, b"some content\n")
 
     results = cr_checker.process_files(
         [test_file],
-        {extension: header_template},
+        {extension: templates[extension]},
         False,
         [str(test_file)],
         use_mmap=False,
@@ -197,12 +151,12 @@ def test_process_files_skips_exclusion_with_missing_header(prepare_test_no_heade
 
 
 # test that process_files function validates a license header after the shebang line
-def test_process_files_accepts_header_after_shebang(tmp_path):
-    cr_checker = load_cr_checker_module()
+def test_process_files_accepts_header_after_shebang(
+    cr_checker, templates, formatted_header, tmp_path
+):
     script = tmp_path / "script.py"
-    header_template = load_template("py")
-    current_year = datetime.now().year
-    header = header_template.format(year=current_year, author="Author")
+    header_template = templates["py"]
+    header = formatted_header("py", CURRENT_YEAR, "Author")
     script.write_text(
         "#!/usr/bin/env python3\n" + header + "print('hi')\n",
         encoding="utf-8",
@@ -222,15 +176,12 @@ def test_process_files_accepts_header_after_shebang(tmp_path):
 
 
 # test that process_files function fixes a missing license header after the shebang line
-def test_process_files_fix_inserts_header_after_shebang(tmp_path):
-    cr_checker = load_cr_checker_module()
+def test_process_files_fix_inserts_header_after_shebang(
+    cr_checker, templates, formatted_header, tmp_path
+):
     script = tmp_path / "script.py"
-    script.write_text(
-        "#!/usr/bin/env python3\nprint('hi')\n",
-        encoding="utf-8",
-    )
-    header_template = load_template("py")
-    current_year = datetime.now().year
+    script.write_bytes(b"#!/usr/bin/env python3\nprint('hi')\n")
+    header_template = templates["py"]
     author = "Author"
     config = write_config(tmp_path, author)
 
@@ -247,19 +198,19 @@ def test_process_files_fix_inserts_header_after_shebang(tmp_path):
 
     assert results["fixed"] == 1
     assert results["no_copyright"] == 1
-    expected_header = header_template.format(year=current_year, author=author)
-    assert script.read_text(encoding="utf-8") == (
-        "#!/usr/bin/env python3\n" + expected_header + "print('hi')\n"
+    expected_header = formatted_header("py", CURRENT_YEAR, author)
+    assert script.read_bytes() == (
+        b"#!/usr/bin/env python3\n" + expected_header.encode("utf-8") + b"print('hi')\n"
     )
 
 
 # test that process_files function validates a license header without the shebang line
-def test_process_files_accepts_header_without_shebang(tmp_path):
-    cr_checker = load_cr_checker_module()
+def test_process_files_accepts_header_without_shebang(
+    cr_checker, templates, formatted_header, tmp_path
+):
     script = tmp_path / "script.py"
-    header_template = load_template("py")
-    current_year = datetime.now().year
-    header = header_template.format(year=current_year, author="Author")
+    header_template = templates["py"]
+    header = formatted_header("py", CURRENT_YEAR, "Author")
     script.write_text(header + "print('hi')\n", encoding="utf-8")
 
     results = cr_checker.process_files(
@@ -276,12 +227,12 @@ def test_process_files_accepts_header_without_shebang(tmp_path):
 
 
 # test that process_files function fixes a missing license header without the shebang
-def test_process_files_fix_inserts_header_without_shebang(tmp_path):
-    cr_checker = load_cr_checker_module()
+def test_process_files_fix_inserts_header_without_shebang(
+    cr_checker, templates, formatted_header, tmp_path
+):
     script = tmp_path / "script.py"
-    script.write_text("print('hi')\n", encoding="utf-8")
-    header_template = load_template("py")
-    current_year = datetime.now().year
+    script.write_bytes(b"print('hi')\n")
+    header_template = templates["py"]
     author = "Author"
     config = write_config(tmp_path, author)
 
@@ -298,5 +249,141 @@ def test_process_files_fix_inserts_header_without_shebang(tmp_path):
 
     assert results["fixed"] == 1
     assert results["no_copyright"] == 1
-    expected_header = header_template.format(year=current_year, author=author)
-    assert script.read_text(encoding="utf-8") == expected_header + "print('hi')\n"
+    expected_header = formatted_header("py", CURRENT_YEAR, author)
+    assert script.read_bytes() == expected_header.encode("utf-8") + b"print('hi')\n"
+
+
+# write the same mix of scripts with and without shebang and header into a directory
+def write_mixed_scripts(directory: Path, header: bytes) -> list[Path]:
+    directory.mkdir()
+    files = []
+    for index in range(8):
+        script = directory / f"script_{index}.py"
+        shebang = b"#!/usr/bin/env python3\n" if index % 2 else b""
+        script.write_bytes(shebang + (header if index % 4 < 2 else b"") + b"pass\n")
+        files.append(script)
+    return files
+
+
+# test that checks and fixes dispatched to worker processes agree with the serial path
+@pytest.mark.parametrize("fix", [False, True])
+def test_process_files_parallel_matches_serial(
+    cr_checker, templates, formatted_header, tmp_path, monkeypatch, fix
+):
+    header = formatted_header("py", CURRENT_YEAR, "Author").encode("utf-8")
+    config = write_config(tmp_path, "Author")
+
+    def run(files):
+        return cr_checker.process_files(
+            files,
+            {"py": templates["py"]},
+            fix,
+            config=config,
+            use_mmap=False,
+            encoding="utf-8",
+            offset=0,
+            remove_offset=0,
+        )
+
+    serial_files = write_mixed_scripts(tmp_path / "serial", header)
+    assert len(serial_files) < cr_checker.PARALLEL_MIN_FILES
+    serial_results = run(serial_files)
+
+    parallel_files = write_mixed_scripts(tmp_path / "parallel", header)
+    monkeypatch.setattr(cr_checker, "PARALLEL_MIN_FILES", 1)
+    monkeypatch.setattr(cr_checker, "available_cpus", lambda: 2)
+    monkeypatch.setattr(cr_checker, "PARALLEL_CHUNKSIZE", 2)
+    parallel_results = run(parallel_files)
+
+    assert parallel_results == serial_results
+    assert serial_results["no_copyright"] == 4
+    assert serial_results["fixed"] == (4 if fix else 0)
+    assert [f.read_bytes() for f in parallel_files] == [
+        f.read_bytes() for f in serial_files
+    ]
+
+
+# test that no worker pool is started when only one CPU is usable
+def test_process_files_single_cpu_runs_serially(
+    cr_checker, templates, formatted_header, tmp_path, monkeypatch
+):
+    header = formatted_header("py", CURRENT_YEAR, "Author").encode("utf-8")
+    files = write_mixed_scripts(tmp_path / "scripts", header)
+
+    def no_pool(*args, **kwargs):
+        raise AssertionError("worker pool started with a single CPU")
+
+    monkeypatch.setattr(cr_checker, "PARALLEL_MIN_FILES", 1)
+    monkeypatch.setattr(cr_checker, "available_cpus", lambda: 1)
+    monkeypatch.setattr(cr_checker.concurrent.futures, "ProcessPoolExecutor", no_pool)
+    results = cr_checker.process_files(
+        files,
+        {"py": templates["py"]},
+        False,
+        use_mmap=False,
+        encoding="utf-8",
+        offset=0,
+        remove_offset=0,
+    )
+
+    assert results["no_copyright"] == 4
+
+
+# test that a missing header is inserted after a shebang followed by blank lines
+def test_process_files_fix_inserts_header_after_shebang_with_blank_line(
+    cr_checker, templates, formatted_header, tmp_path
+):
+    script = tmp_path / "script.py"
+    script.write_bytes(b"#!/usr/bin/env python3\n\nprint('hi')\n")
+    config = write_config(tmp_path, "Author")
+
+    results = cr_checker.process_files(
+        [script],
+        {"py": templates["py"]},
+        True,
+        config=config,
+        use_mmap=False,
+        encoding="utf-8",
+        offset=0,
+        remove_offset=0,
+    )
+
+    assert results["fixed"] == 1
+    expected_header = formatted_header("py", CURRENT_YEAR, "Author")
+    assert script.read_bytes() == (
+        b"#!/usr/bin/env python3\n"
+        + expected_header.encode("utf-8")
+        + b"\nprint('hi')\n"
+    )
+    results = cr_checker.process_files(
+        [script],
+        {"py": templates["py"]},
+        False,
+        use_mmap=False,
+        encoding="utf-8",
+        offset=0,
+        remove_offset=0,
+    )
+    assert results["no_copyright"] == 0
+
+
+# test that headers with CRLF line endings are accepted on both read paths
+@pytest.mark.parametrize("use_mmap", [False, True])
+def test_process_files_accepts_header_with_crlf(
+    cr_checker, templates, formatted_header, tmp_path, use_mmap
+):
+    script = tmp_path / "script.py"
+    header = formatted_header("py", CURRENT_YEAR, "Author")
+    script.write_bytes((header + "print('hi')\n").replace("\n", "\r\n").encode())
+
+    results = cr_checker.process_files(
+        [script],
+        {"py": templates["py"]},
+        False,
+        use_mmap=use_mmap,
+        encoding="utf-8",
+        offset=0,
+        remove_offset=0,
+    )
+
+    assert results["no_copyright"] == 0
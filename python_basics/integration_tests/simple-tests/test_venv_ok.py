@@ -18,31 +18,45 @@ from pathlib import Path
 def test_venv_ok():
     runfiles = os.getenv("RUNFILES_DIR")
     assert runfiles, "runfiles could not be found, RUNFILES_DIR is not set"
-    packages = os.listdir(runfiles)
-    assert any(x.endswith("pytest") for x in packages), (
-        f"'Pytest not found in runfiles: {runfiles}"
-    )
+    # Look for pytest and the python interpreter in a single pass over the runfiles
+    pytest_found = False
+    python_venv_folder = None
+    with os.scandir(runfiles) as entries:
+        for entry in entries:
+            if entry.name.endswith("pytest"):
+                pytest_found = True
+            if python_venv_folder is None and "python_3_12_" in entry.name:
+                python_venv_folder = entry.name
+            if pytest_found and python_venv_folder is not None:
+                break
+    assert pytest_found, f"'Pytest not found in runfiles: {runfiles}"
     try:
         import pytest  # type ignore
 
-        python_venv_folder = [x for x in packages if "python_3_12_" in x][0]
+        assert python_venv_folder, f"python not found in runfiles: {runfiles}"
 
-        # Trying to actually use pytest module and collect current test & file
+        # Trying to actually use pytest module and collect current test & file.
+        # Only this file is collected, walking all of the runfiles (including the
+        # venv itself) is what makes the collection slow.
         proc = subprocess.run(
             [
                 python_venv_folder + "/bin/python",
                 "-m",
                 "pytest",
                 "--collect-only",
+                "-q",
+                "-p",
+                "no:cacheprovider",
+                __file__,
             ],
             cwd=runfiles,
             check=True,
             capture_output=True,
         )
-        assert "test_venv_ok.py" in str(proc.stdout), (
+        assert b"test_venv_ok.py" in proc.stdout, (
             "test_venv_ok.py, file not found in pytest collect"
         )
-        assert "test_venv_ok" in str(proc.stdout), (
+        assert b"test_venv_ok" in proc.stdout, (
             "test_venv_ok, test not found in pytest collect"
         )
         assert proc.returncode == 0, (
@@ -15,10 +15,9 @@ import os
 
 def test_venv_ok():
     runfiles = os.getenv("RUNFILES_DIR")
-    packages = os.listdir(runfiles)
-    assert any(x.endswith("requests") for x in packages), (
-        f"'Request not found in runfiles: {runfiles}"
-    )
+    with os.scandir(runfiles) as entries:
+        requests_found = any(entry.name.endswith("requests") for entry in entries)
+    assert requests_found, f"'Request not found in runfiles: {runfiles}"
     try:
         import requests
     except Exception as e:
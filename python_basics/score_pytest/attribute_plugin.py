@@ -22,6 +22,9 @@ import pytest
 TestFunction = Callable[..., Any]
 Decorator = Callable[[TestFunction], TestFunction]
 
+# Properties of the 'test_properties' marker, resolved once per item at collection
+TEST_PROPERTIES = pytest.StashKey[list[tuple[str, str]]]()
+
 
 def add_test_properties(
     *,
@@ -63,59 +66,72 @@ def add_test_properties(
     #     raise ValueError("'derivation_technique' is required and cannot be empty.")
     #
 
+    # The properties only depend on the arguments above, so the marker is built
+    # once and shared by every function it decorates
+    properties = {
+        "PartiallyVerifies": ", ".join(partially_verifies)
+        if partially_verifies
+        else "",
+        "FullyVerifies": ", ".join(fully_verifies) if fully_verifies else "",
+        "TestType": test_type,
+        "DerivationTechnique": derivation_technique,
+    }
+    # NOTE: This might come back to bite us in some weird edgecase, though I have not thought of one so far
+    # Remove keys with 'falsey' values
+    cleaned_properties = {k: v for k, v in properties.items() if v}
+    marker = pytest.mark.test_properties(cleaned_properties)
+
     def decorator(func: TestFunction) -> TestFunction:
-        # Clean properties (skip None)
-        properties = {
-            "PartiallyVerifies": ", ".join(partially_verifies)
-            if partially_verifies
-            else "",
-            "FullyVerifies": ", ".join(fully_verifies) if fully_verifies else "",
-            "TestType": test_type,
-            "DerivationTechnique": derivation_technique,
-        }
         # Ensure a 'description' is there inside the Docstring
         if not func.__doc__ or not func.__doc__.strip():
             raise ValueError(
                 f"{func.__name__} does not have a description."
                 + "Descriptions (in docstrings) are mandatory."
             )
-        # NOTE: This might come back to bite us in some weird edgecase, though I have not thought of one so far
-        # Remove keys with 'falsey' values
-        cleaned_properties = {k: v for k, v in properties.items() if v}
-        return pytest.mark.test_properties(cleaned_properties)(func)
+        return marker(func)
 
     return decorator
 
 
-def pytest_runtest_makereport(item: pytest.Item, call: pytest.CallInfo[None]) -> None:
-    """Attach file and line info to the report for use in junitxml output."""
-    if call.when != "call":
-        return
+@pytest.hookimpl(trylast=True)
+def pytest_collection_modifyitems(items: list[pytest.Item]) -> None:
+    """Resolve the properties of every item once, after all markers are applied."""
     # Since our decorator 'add_test_properties' will create a 'test_properties' marker
     # This function then searches for the nearest dictionary attached to an item with
     # that marker and parses this into properties.
+    for item in items:
+        marker = item.get_closest_marker("test_properties")
+        if marker and isinstance(marker.args[0], dict):
+            item.stash[TEST_PROPERTIES] = [
+                (k, str(v)) for k, v in marker.args[0].items()
+            ]
+
 
+def pytest_runtest_makereport(item: pytest.Item, call: pytest.CallInfo[None]) -> None:
+    """Attach file and line info to the report for use in junitxml output."""
+    if call.when != "call":
+        return
     # In short:
     #   => This function adds the properties specified via the decorator to the item so
     #      they can be written to the XML output in the end
     # Note: This does NOT add 'line' and 'file' to the testcase.
-
-    marker = item.get_closest_marker("test_properties")
-    if marker and isinstance(marker.args[0], dict):
-        for k, v in marker.args[0].items():
-            item.user_properties.append((k, str(v)))
+    item.user_properties.extend(item.stash.get(TEST_PROPERTIES, ()))
 
 
 @pytest.fixture(autouse=True)
-def add_file_and_line_attr(
-    record_xml_attribute: Callable[[str, str], None], request: pytest.FixtureRequest
-) -> None:
+def add_file_and_line_attr(request: pytest.FixtureRequest) -> None:
     """Adding line & file to the <testcase> attribute in the XML"""
+    # Nothing to record into when no XML report is written
+    if not request.config.getoption("xmlpath", default=None):
+        return
+    record_xml_attribute: Callable[[str, str], None] = request.getfixturevalue(
+        "record_xml_attribute"
+    )
     node = request.node
     raw_file_path, line_number, _ = node.location
 
     # turning `../../../_main/<file_path>` into => <filepath>
-    clean_file_path = raw_file_path.split("_main/")[-1]
-    record_xml_attribute("file", str(clean_file_path))
+    clean_file_path = raw_file_path.rpartition("_main/")[2]
+    record_xml_attribute("file", clean_file_path)
     # Adding +1 to the line so we point to the decorator instead of above it
     record_xml_attribute("line", str(line_number + 1))
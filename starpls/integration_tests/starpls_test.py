@@ -11,6 +11,7 @@
 # SPDX-License-Identifier: Apache-2.0
 # *******************************************************************************
 import os
+import select
 import subprocess
 import unittest
 import time
@@ -20,26 +21,57 @@ from runfiles import Runfiles
 
 
 def format_lsp_request(msg):
-    """Formats a JSON dictionary into an LSP message with headers."""
+    """Formats a JSON dictionary into the bytes of an LSP message with headers."""
 
-    json_msg = json.dumps(msg)
-    content_length = len(json_msg.encode("utf-8"))
-    return f"Content-Length: {content_length}\r\n\r\n{json_msg}"
+    content = json.dumps(msg, separators=(",", ":")).encode("utf-8")
+    return b"Content-Length: %d\r\n\r\n%s" % (len(content), content)
+
+
+def read_lsp_message(stream, timeout):
+    """Reads the content of one LSP message, waiting at most `timeout` seconds."""
+
+    deadline = time.monotonic() + timeout
+    fd = stream.fileno()
+
+    def read_available():
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or not select.select([fd], [], [], remaining)[0]:
+            raise TimeoutError(f"No complete LSP message within {timeout} seconds")
+        chunk = os.read(fd, 4096)
+        if not chunk:
+            raise EOFError("Stream closed before a complete LSP message was read")
+        return chunk
+
+    data = b""
+    while b"\r\n\r\n" not in data:
+        data += read_available()
+    header, _, content = data.partition(b"\r\n\r\n")
+
+    content_length = 0
+    for line in header.split(b"\r\n"):
+        name, _, value = line.partition(b":")
+        if name.strip().lower() == b"content-length":
+            content_length = int(value)
+
+    while len(content) < content_length:
+        content += read_available()
+    return content[:content_length]
 
 
 class StarplsIntegrationTest(unittest.TestCase):
-    def setUp(self):
-        """Runs before each test method."""
-        self.runfiles = Runfiles.Create()
+    @classmethod
+    def setUpClass(cls):
+        """Runs once before all test methods, they share the binary lookup."""
+        cls.runfiles = Runfiles.Create()
 
         binary_runfile_path = "_main/_starpls_binary_for_test_bin"
-        self.starpls_binary_path = self.runfiles.Rlocation(binary_runfile_path)
+        cls.starpls_binary_path = cls.runfiles.Rlocation(binary_runfile_path)
 
-        if not self.starpls_binary_path:
-            self.fail(
-                f"setUp failed: Could not find starpls binary via runfiles at {binary_runfile_path}"
+        if not cls.starpls_binary_path:
+            raise cls.failureException(
+                f"setUpClass failed: Could not find starpls binary via runfiles at {binary_runfile_path}"
             )
-        print(f"Found starpls binary for test: {self.starpls_binary_path}")
+        print(f"Found starpls binary for test: {cls.starpls_binary_path}")
 
     def test_starpls_binary_downloaded_and_executable(self):
         """
@@ -54,7 +86,6 @@ class StarplsIntegrationTest(unittest.TestCase):
             result = subprocess.run(
                 [binary_real_path, "version"],
                 capture_output=True,
-                text=True,
                 check=True,
                 timeout=15,
             )
@@ -63,7 +94,7 @@ class StarplsIntegrationTest(unittest.TestCase):
 
             self.assertEqual(result.returncode, 0, "Running starpls version failed")
             self.assertIn(
-                "starpls", result.stdout, "Expected 'starpls' in version output"
+                b"starpls", result.stdout, "Expected 'starpls' in version output"
             )
         except FileNotFoundError:
             self.fail(f"Failed to execute binary: File not found at {binary_real_path}")
@@ -84,18 +115,15 @@ class StarplsIntegrationTest(unittest.TestCase):
                 [binary_real_path, "server"],
                 stdin=subprocess.PIPE,
                 stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
+                # Not piped: nobody reads it while waiting for the response, so a
+                # chatty server could block on a full pipe. It ends up in the test log.
+                stderr=None,
                 text=False,
             )
 
-            time.sleep(5)
-
-            if server_process.poll() is not None:
-                raise RuntimeError(
-                    f"Server process terminated prematurely with code {server_process.returncode}"
-                )
-
-            print("Server process running. Sending init request.")
+            # The request is buffered in the pipe, so there is no need to wait for
+            # the server to start before sending it
+            print("Server process started. Sending init request.")
 
             # Send Init Request
             initialize_request = {
@@ -109,17 +137,21 @@ class StarplsIntegrationTest(unittest.TestCase):
                 },
             }
 
-            lsp_request_bytes = format_lsp_request(initialize_request).encode("utf-8")
+            lsp_request_bytes = format_lsp_request(initialize_request)
             print(f"Sending Request Bytes: {lsp_request_bytes}")
             server_process.stdin.write(lsp_request_bytes)
             server_process.stdin.flush()
-            # IMPORTANT: Wait for server to process the request
-            time.sleep(1)
-            server_process.stdin.close()
 
-            # Read Any Response
+            # Read Any Response, returns as soon as the server has answered
             print("Try and read any response.")
-            stdout_output = server_process.stdout.read()
+            try:
+                stdout_output = read_lsp_message(server_process.stdout, timeout=10)
+            except (TimeoutError, EOFError):
+                if server_process.poll() is not None:
+                    raise RuntimeError(
+                        f"Server process terminated prematurely with code {server_process.returncode}"
+                    )
+                raise
 
             print(f"Received stdout Bytes: {stdout_output}")
             self.assertGreater(
@@ -137,10 +169,10 @@ class StarplsIntegrationTest(unittest.TestCase):
             print("Test cleanup: Terminate server process.")
             if server_process:
                 if server_process.poll() is None:
+                    if not server_process.stdin.closed:
+                        server_process.stdin.close()
                     if not server_process.stdout.closed:
                         server_process.stdout.close()
-                    if not server_process.stderr.closed:
-                        server_process.stderr.close()
 
                     # try and terminate before killing
                     server_process.terminate()